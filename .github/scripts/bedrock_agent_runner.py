@@ -15,17 +15,36 @@ Environment Variables:
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
 import re
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Optional
 
-import boto3
-from botocore.config import Config
-from botocore.exceptions import ClientError
+# boto3/botocore are imported lazily so --help and argument errors stay fast
+
+# Prefer orjson for faster JSON handling when available
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
 
 # Configure logging
 logging.basicConfig(
@@ -34,9 +53,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for diff splitting and response cleanup
+_FILE_DIFF_RE = re.compile(r'^diff --git a/', re.MULTILINE)
+_MD_FENCE_OPEN = re.compile(r'```(?:json)?\s*')
+_MD_FENCE_CLOSE = re.compile(r'```\s*$')
+
 # Model configurations
 MODELS = {
     "haiku": "anthropic.claude-3-haiku-20240307-v1:0",
+    "haiku-3.5": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
     "sonnet": "anthropic.claude-3-5-sonnet-20241022-v2:0",
     "sonnet-4": "anthropic.claude-sonnet-4-20250514-v1:0",
     "opus": "anthropic.claude-opus-4-20250514-v1:0",
@@ -45,6 +70,24 @@ MODELS = {
 # Default model - Haiku for cost efficiency
 DEFAULT_MODEL = "haiku"
 
+# Models that accept Converse cachePoint blocks (prompt caching)
+PROMPT_CACHE_MODELS = frozenset({
+    MODELS["sonnet-4"],
+    MODELS["opus"],
+})
+
+# Maximum concurrent Bedrock calls when reviewing a chunked diff
+MAX_CHUNK_WORKERS = 4
+
+# Upper bound on diff size read from gh; anything beyond this is never reviewed
+MAX_DIFF_CHARS = 2_000_000
+
+# Project gh pr view output down to the fields used in the prompt
+PR_VIEW_JQ = (
+    '{title, body, additions, deletions, changedFiles, '
+    'author: .author.login, files: [.files[:50][].path]}'
+)
+
 # Agent configurations
 AGENTS = {
     "code_quality": {
@@ -84,51 +127,134 @@ AGENTS = {
     },
 }
 
+# Precomputed CLI choices
+_AGENT_CHOICES = tuple(AGENTS.keys())
+_MODEL_CHOICES = tuple(MODELS.keys())
+
+# Read-only response templates used when JSON parsing fails
+_DEFAULT_RESPONSES = MappingProxyType({
+    "code_quality": MappingProxyType({
+        "status": "ERROR",
+        "violations_count": 0,
+        "violations": (),
+        "summary": "Failed to parse response. Raw output available.",
+    }),
+    "architect": MappingProxyType({
+        "status": "ERROR",
+        "new_pattern_found": False,
+        "patterns": (),
+        "summary": "Failed to parse response. Raw output available.",
+    }),
+    "lld_alignment": MappingProxyType({
+        "status": "ERROR",
+        "deviations": (),
+        "summary": "Failed to parse response. Raw output available.",
+    }),
+})
+_DEFAULT_RESPONSE_FALLBACK = MappingProxyType({"status": "ERROR"})
+
+# Result statuses that fail the CLI run
+_FAIL_STATUSES = frozenset({'FAIL', 'ERROR', 'LLD_DEVIATION_FOUND'})
+
+
+# Shared boto3 session and clients, reused across runner instances
+_SESSION: Optional[Any] = None
+_CLIENT_CACHE: dict[tuple, Any] = {}
+
+
+def _get_session():
+    """Return the shared boto3 session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        import boto3
+        _SESSION = boto3.Session()
+    return _SESSION
+
+
+@functools.cache
+def _resolve_repo_root() -> Path:
+    """Resolve the repository root once per process."""
+    # GitHub Actions checks the repo out at GITHUB_WORKSPACE
+    workspace = os.environ.get('GITHUB_WORKSPACE')
+    if workspace and (Path(workspace) / '.git').exists():
+        return Path(workspace)
+
+    try:
+        toplevel = subprocess.check_output(
+            ['git', 'rev-parse', '--show-toplevel'],
+            text=True, stderr=subprocess.DEVNULL
+        ).strip()
+        if toplevel:
+            return Path(toplevel)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        pass
+
+    # Fall back to walking up from the working directory
+    current = Path.cwd()
+    while current != current.parent:
+        if (current / '.git').exists():
+            return current
+        current = current.parent
+    return Path.cwd()
+
 
 class BedrockAgentRunner:
     """Runs peer review agents using AWS Bedrock Claude models."""
 
-    def __init__(self, region: str = "us-east-1"):
+    def __init__(self, region: str = "us-east-1", max_pool_connections: int = 50):
         """Initialize the Bedrock client with retry configuration."""
+        from botocore.config import Config
+
         self.region = region
-        self.config = Config(
-            retries={
-                'max_attempts': 5,
-                'mode': 'adaptive'  # Exponential backoff with jitter
-            },
-            connect_timeout=10,
-            read_timeout=120  # 2 minutes for long responses
-        )
-        self.client = boto3.client(
-            'bedrock-runtime',
-            region_name=region,
-            config=self.config
-        )
+        connect_timeout = 10
+        read_timeout = 120  # 2 minutes for long responses
+
+        # Reuse an existing client for the same region/config
+        key = (region, max_pool_connections, read_timeout, connect_timeout)
+        if key not in _CLIENT_CACHE:
+            config = Config(
+                retries={
+                    'max_attempts': 5,
+                    'mode': 'adaptive'  # Exponential backoff with jitter
+                },
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                max_pool_connections=max_pool_connections  # Keep connections warm for concurrent chunks
+            )
+            _CLIENT_CACHE[key] = _get_session().client(
+                'bedrock-runtime',
+                region_name=region,
+                config=config
+            )
+        self.client = _CLIENT_CACHE[key]
+        self.config = self.client.meta.config
         self.repo_root = self._find_repo_root()
+        self._prompt_cache: dict[str, str] = {}
 
     def _find_repo_root(self) -> Path:
         """Find the repository root directory."""
-        current = Path.cwd()
-        while current != current.parent:
-            if (current / '.git').exists():
-                return current
-            current = current.parent
-        return Path.cwd()
+        return _resolve_repo_root()
 
     def _load_agent_prompt(self, agent_name: str) -> str:
-        """Load the agent specification/prompt from file."""
+        """Load the agent specification/prompt from file (cached per runner)."""
+        if agent_name in self._prompt_cache:
+            return self._prompt_cache[agent_name]
+
         if agent_name not in AGENTS:
             raise ValueError(f"Unknown agent: {agent_name}. Available: {list(AGENTS.keys())}")
 
         agent_config = AGENTS[agent_name]
         prompt_path = self.repo_root / agent_config["prompt_file"]
 
-        if not prompt_path.exists():
+        try:
+            prompt = prompt_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
             logger.warning(f"Agent prompt file not found: {prompt_path}")
             # Return a basic prompt if file doesn't exist
-            return self._get_default_prompt(agent_name)
+            prompt = self._get_default_prompt(agent_name)
 
-        return prompt_path.read_text(encoding='utf-8')
+        self._prompt_cache[agent_name] = prompt
+        return prompt
 
     def _get_default_prompt(self, agent_name: str) -> str:
         """Get a default prompt for an agent if file doesn't exist."""
@@ -198,33 +324,50 @@ Return your analysis as JSON with this structure:
 
     def _get_pr_context(self, pr_number: int) -> dict:
         """Fetch PR context from GitHub."""
-        import subprocess
-
         try:
-            # Get PR details
-            pr_info = subprocess.run(
+            # Start both gh calls so the metadata fetch overlaps the diff download
+            view_proc = subprocess.Popen(
                 ['gh', 'pr', 'view', str(pr_number), '--json',
-                 'title,body,additions,deletions,changedFiles,files,author'],
-                capture_output=True, text=True, check=True
+                 'title,body,additions,deletions,changedFiles,files,author',
+                 '--jq', PR_VIEW_JQ],
+                stdout=subprocess.PIPE  # bytes: JSON parser decodes directly
             )
-            pr_data = json.loads(pr_info.stdout)
-
-            # Get PR diff
-            diff_result = subprocess.run(
+            diff_proc = subprocess.Popen(
                 ['gh', 'pr', 'diff', str(pr_number)],
-                capture_output=True, text=True, check=True
+                stdout=subprocess.PIPE, text=True, bufsize=1 << 20
             )
-            pr_diff = diff_result.stdout
+
+            # Stream the diff, stopping once it exceeds the size cap
+            diff_parts = []
+            diff_len = 0
+            truncated = False
+            for line in diff_proc.stdout:
+                diff_parts.append(line)
+                diff_len += len(line)
+                if diff_len > MAX_DIFF_CHARS:
+                    logger.warning(f"PR diff exceeds {MAX_DIFF_CHARS} chars, truncating")
+                    truncated = True
+                    diff_proc.kill()
+                    break
+            diff_proc.stdout.close()
+            if diff_proc.wait() != 0 and not truncated:
+                raise subprocess.CalledProcessError(diff_proc.returncode, diff_proc.args)
+            pr_diff = ''.join(diff_parts)
+
+            view_out, _ = view_proc.communicate()
+            if view_proc.returncode != 0:
+                raise subprocess.CalledProcessError(view_proc.returncode, view_proc.args)
+            pr_data = _loads(view_out)
 
             return {
                 "pr_number": pr_number,
                 "title": pr_data.get("title", ""),
                 "description": pr_data.get("body", ""),
-                "author": pr_data.get("author", {}).get("login", "unknown"),
+                "author": pr_data.get("author") or "unknown",
                 "additions": pr_data.get("additions", 0),
                 "deletions": pr_data.get("deletions", 0),
                 "files_changed": pr_data.get("changedFiles", 0),
-                "files": [f.get("path") for f in pr_data.get("files", [])],
+                "files": pr_data.get("files") or [],
                 "diff": pr_diff
             }
         except subprocess.CalledProcessError as e:
@@ -240,28 +383,53 @@ Return your analysis as JSON with this structure:
             return [diff]
 
         # Split by file boundaries
-        file_pattern = r'(diff --git a/.*?(?=diff --git a/|\Z))'
-        file_diffs = re.findall(file_pattern, diff, re.DOTALL)
+        starts = [m.start() for m in _FILE_DIFF_RE.finditer(diff)]
+        ends = starts[1:] + [len(diff)]
+        file_diffs = [diff[start:end] for start, end in zip(starts, ends)]
 
         chunks = []
-        current_chunk = ""
+        current_parts: list[str] = []
+        current_len = 0
 
         for file_diff in file_diffs:
-            if len(current_chunk) + len(file_diff) > max_chars and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = file_diff
+            if current_len + len(file_diff) > max_chars and current_parts:
+                chunks.append(''.join(current_parts))
+                current_parts = [file_diff]
+                current_len = len(file_diff)
             else:
-                current_chunk += file_diff
+                current_parts.append(file_diff)
+                current_len += len(file_diff)
 
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_parts:
+            chunks.append(''.join(current_parts))
 
         logger.info(f"Split diff into {len(chunks)} chunks")
         return chunks
 
-    def _create_review_prompt(self, agent_prompt: str, pr_context: dict) -> str:
+    def _create_review_prompt(
+        self,
+        agent_prompt: str,
+        pr_context: dict,
+        diff_override: Optional[str] = None
+    ) -> str:
         """Create the full prompt for the review."""
-        return f"""{agent_prompt}
+        return ''.join(self._create_review_prompt_parts(agent_prompt, pr_context, diff_override))
+
+    def _create_review_prompt_parts(
+        self,
+        agent_prompt: str,
+        pr_context: dict,
+        diff_override: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Create the review prompt split into a cacheable prefix and a diff suffix.
+
+        The prefix (agent spec, PR metadata, file list) is identical for every
+        chunk of a PR; only the suffix carries the diff. ``diff_override``
+        replaces the PR diff, e.g. with a single chunk.
+        """
+        diff_view = (diff_override if diff_override is not None else pr_context['diff'])[:100000]
+        prefix = f"""{agent_prompt}
 
 <pull_request>
 <metadata>
@@ -282,11 +450,59 @@ Deletions: {pr_context['deletions']}
 </files>
 
 <diff>
-{pr_context['diff'][:100000]}
+"""
+        suffix = f"""{diff_view}
 </diff>
 </pull_request>
 
 Analyze this pull request and provide your review as valid JSON only. Do not include any markdown formatting or code blocks - just the raw JSON object."""
+        return prefix, suffix
+
+    def _build_content(self, model_id: str, prefix: str, suffix: str) -> list[dict]:
+        """Build Converse content blocks, marking the prefix cacheable where supported."""
+        if model_id in PROMPT_CACHE_MODELS:
+            return [{"text": prefix}, {"cachePoint": {"type": "default"}}, {"text": suffix}]
+        return [{"text": prefix + suffix}]
+
+    def _converse_stream(
+        self,
+        model_id: str,
+        content: list[dict],
+        agent_config: dict
+    ) -> tuple[str, dict]:
+        """
+        Call Bedrock converse_stream and assemble the streamed text.
+
+        Returns:
+            Tuple of (response text, usage dictionary)
+        """
+        response = self.client.converse_stream(
+            modelId=model_id,
+            messages=[
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+            inferenceConfig={
+                "maxTokens": agent_config["max_tokens"],
+                "temperature": agent_config["temperature"],
+                "topP": 0.9
+            }
+        )
+
+        parts: list[str] = []
+        usage: dict = {}
+        for event in response['stream']:
+            if 'contentBlockDelta' in event:
+                parts.append(event['contentBlockDelta']['delta'].get('text', ''))
+            elif 'messageStop' in event:
+                if event['messageStop'].get('stopReason') == 'max_tokens':
+                    logger.warning("Response truncated at max_tokens; JSON may be incomplete")
+            elif 'metadata' in event:
+                usage = event['metadata'].get('usage', {})
+
+        return ''.join(parts), usage
 
     def invoke_agent(
         self,
@@ -305,6 +521,8 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         Returns:
             Agent response as dictionary
         """
+        from botocore.exceptions import ClientError
+
         agent_config = AGENTS[agent_name]
         model_key = model_override or agent_config["model"]
         model_id = MODELS.get(model_key, MODELS[DEFAULT_MODEL])
@@ -314,37 +532,28 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         # Load agent prompt
         agent_prompt = self._load_agent_prompt(agent_name)
 
-        # Create full prompt
-        full_prompt = self._create_review_prompt(agent_prompt, pr_context)
+        # Estimate prompt size without building it; metadata/files fit in ~2K chars
+        prompt_overhead = len(agent_prompt) + len(pr_context['description'] or '') + 2000
+        diff_len = min(len(pr_context['diff']), 100000)
 
         # Handle large diffs by chunking
-        if len(full_prompt) > 150000:  # ~37.5K tokens
+        if prompt_overhead + diff_len > 150000:  # ~37.5K tokens
             logger.warning("Large PR detected, using chunked analysis")
             return self._invoke_chunked(agent_name, agent_config, model_id, pr_context)
 
+        # Create full prompt
+        prefix, suffix = self._create_review_prompt_parts(agent_prompt, pr_context)
+
         try:
-            response = self.client.converse(
-                modelId=model_id,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [{"text": full_prompt}]
-                    }
-                ],
-                inferenceConfig={
-                    "maxTokens": agent_config["max_tokens"],
-                    "temperature": agent_config["temperature"],
-                    "topP": 0.9
-                }
+            # A single call has nothing to reuse a cached prefix, so skip the cache write
+            response_text, usage = self._converse_stream(
+                model_id, [{"text": prefix + suffix}], agent_config
             )
 
-            # Extract response
-            response_text = response['output']['message']['content'][0]['text']
-
             # Log token usage
-            usage = response.get('usage', {})
             logger.info(f"Tokens used - Input: {usage.get('inputTokens', 'N/A')}, "
-                       f"Output: {usage.get('outputTokens', 'N/A')}")
+                       f"Output: {usage.get('outputTokens', 'N/A')}, "
+                       f"Cache read: {usage.get('cacheReadInputTokens', 0)}")
 
             # Parse JSON response
             return self._parse_json_response(response_text, agent_name)
@@ -366,46 +575,70 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         model_id: str,
         pr_context: dict
     ) -> dict:
-        """Handle large PRs by chunking the diff."""
+        """Handle large PRs by chunking the diff and reviewing chunks concurrently."""
+        from botocore.exceptions import ClientError
+
         chunks = self._chunk_diff(pr_context['diff'])
-        all_results = []
-
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {i+1}/{len(chunks)}")
-
-            chunk_context = pr_context.copy()
-            chunk_context['diff'] = chunk
-
-            agent_prompt = self._load_agent_prompt(agent_name)
-            full_prompt = self._create_review_prompt(agent_prompt, chunk_context)
-
-            try:
-                response = self.client.converse(
-                    modelId=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [{"text": full_prompt}]
-                        }
-                    ],
-                    inferenceConfig={
-                        "maxTokens": agent_config["max_tokens"],
-                        "temperature": agent_config["temperature"],
-                        "topP": 0.9
-                    }
-                )
-
-                response_text = response['output']['message']['content'][0]['text']
-                chunk_result = self._parse_json_response(response_text, agent_name)
-                all_results.append(chunk_result)
-
-            except ClientError as e:
-                logger.error(f"Error processing chunk {i+1}: {e}")
-                continue
-
-        # Aggregate results
+        if not chunks:
+            # ThreadPoolExecutor rejects max_workers=0
+            return self._aggregate_chunk_results([], agent_name)
+        agent_prompt = self._load_agent_prompt(agent_name)
+        indexed_results = []
+        cache_prefix = len(chunks) > 1
+
+        # A cache entry is only readable once the request writing it has started responding,
+        # so review the first chunk alone to warm the prefix before fanning out the rest
+        try:
+            indexed_results.append(self._invoke_one_chunk(
+                0, chunks[0], agent_name, agent_prompt, agent_config, model_id, pr_context, cache_prefix
+            ))
+        except ClientError as e:
+            logger.error(f"Error processing chunk 1: {e}")
+
+        if len(chunks) > 1:
+            logger.info(f"Processing {len(chunks) - 1} remaining chunks with up to {MAX_CHUNK_WORKERS} workers")
+            with ThreadPoolExecutor(max_workers=min(MAX_CHUNK_WORKERS, len(chunks) - 1)) as executor:
+                futures = {
+                    executor.submit(
+                        self._invoke_one_chunk,
+                        i, chunk, agent_name, agent_prompt, agent_config, model_id, pr_context, cache_prefix
+                    ): i
+                    for i, chunk in enumerate(chunks[1:], start=1)
+                }
+                for future in as_completed(futures):
+                    try:
+                        indexed_results.append(future.result())
+                    except ClientError as e:
+                        logger.error(f"Error processing chunk {futures[future]+1}: {e}")
+
+        # Aggregate results in original chunk order
+        indexed_results.sort(key=lambda item: item[0])
+        all_results = [result for _, result in indexed_results]
         return self._aggregate_chunk_results(all_results, agent_name)
 
+    def _invoke_one_chunk(
+        self,
+        index: int,
+        chunk: str,
+        agent_name: str,
+        agent_prompt: str,
+        agent_config: dict,
+        model_id: str,
+        pr_context: dict,
+        cache_prefix: bool
+    ) -> tuple[int, dict]:
+        """Review a single diff chunk, optionally marking the shared prefix cacheable.
+
+        Returns (chunk index, parsed result).
+        """
+        logger.info(f"Processing chunk {index+1}")
+
+        prefix, suffix = self._create_review_prompt_parts(agent_prompt, pr_context, diff_override=chunk)
+
+        content = self._build_content(model_id, prefix, suffix) if cache_prefix else [{"text": prefix + suffix}]
+        response_text, _ = self._converse_stream(model_id, content, agent_config)
+        return index, self._parse_json_response(response_text, agent_name)
+
     def _aggregate_chunk_results(self, results: list[dict], agent_name: str) -> dict:
         """Aggregate results from multiple chunks."""
         if not results:
@@ -413,9 +646,7 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
 
         if agent_name == "code_quality":
             # Aggregate violations
-            all_violations = []
-            for r in results:
-                all_violations.extend(r.get("violations", []))
+            all_violations = list(chain.from_iterable(r.get("violations") or () for r in results))
 
             status = "FAIL" if all_violations else "PASS"
             return {
@@ -427,11 +658,13 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
 
         elif agent_name == "architect":
             # Aggregate patterns
-            all_patterns = []
-            for r in results:
-                all_patterns.extend(r.get("patterns", []))
+            all_patterns = list(chain.from_iterable(r.get("patterns") or () for r in results))
 
-            new_pattern_found = any(r.get("new_pattern_found", False) for r in results)
+            new_pattern_found = False
+            for r in results:
+                if r.get("new_pattern_found"):
+                    new_pattern_found = True
+                    break
             status = "NEW_PATTERN_DETECTED" if new_pattern_found else "NO_NEW_PATTERN"
 
             return {
@@ -448,12 +681,25 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
 
     def _parse_json_response(self, response_text: str, agent_name: str) -> dict:
         """Parse JSON from Claude's response."""
+        # Happy path: the prompt asks for raw JSON only
+        try:
+            return _loads(response_text)
+        except json.JSONDecodeError:
+            pass
+
         # Remove markdown code blocks if present
-        cleaned = re.sub(r'```(?:json)?\s*', '', response_text)
-        cleaned = re.sub(r'```\s*$', '', cleaned).strip()
+        cleaned = response_text.strip()
+        if cleaned.startswith('```'):
+            newline = cleaned.find('\n')
+            cleaned = cleaned[newline + 1:] if newline != -1 else cleaned[3:].removeprefix('json')
+            cleaned = cleaned.removesuffix('```').rstrip()
+        else:
+            # Non-standard layout (e.g. prose before the fence)
+            cleaned = _MD_FENCE_OPEN.sub('', cleaned)
+            cleaned = _MD_FENCE_CLOSE.sub('', cleaned).strip()
 
         try:
-            return json.loads(cleaned)
+            return _loads(cleaned)
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse JSON response: {e}")
             logger.debug(f"Raw response: {response_text[:500]}...")
@@ -463,39 +709,18 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
 
     def _get_default_response(self, agent_name: str, raw_text: str) -> dict:
         """Get default response structure when JSON parsing fails."""
-        defaults = {
-            "code_quality": {
-                "status": "ERROR",
-                "violations_count": 0,
-                "violations": [],
-                "summary": f"Failed to parse response. Raw output available.",
-                "_raw": raw_text[:1000]
-            },
-            "architect": {
-                "status": "ERROR",
-                "new_pattern_found": False,
-                "patterns": [],
-                "summary": f"Failed to parse response. Raw output available.",
-                "_raw": raw_text[:1000]
-            },
-            "lld_alignment": {
-                "status": "ERROR",
-                "deviations": [],
-                "summary": f"Failed to parse response. Raw output available.",
-                "_raw": raw_text[:1000]
-            },
-        }
-        return defaults.get(agent_name, {"status": "ERROR", "_raw": raw_text[:1000]})
+        template = _DEFAULT_RESPONSES.get(agent_name, _DEFAULT_RESPONSE_FALLBACK)
+        return {**template, "_raw": raw_text[:1000]}
 
 
 def main():
     """Main entry point for CLI usage."""
     parser = argparse.ArgumentParser(description='Run PR review agent using AWS Bedrock Claude')
-    parser.add_argument('--agent', required=True, choices=list(AGENTS.keys()),
+    parser.add_argument('--agent', required=True, choices=_AGENT_CHOICES,
                        help='Agent to run')
     parser.add_argument('--pr', required=True, type=int,
                        help='PR number to review')
-    parser.add_argument('--model', choices=list(MODELS.keys()),
+    parser.add_argument('--model', choices=_MODEL_CHOICES,
                        help='Override model selection')
     parser.add_argument('--region', default='us-east-1',
                        help='AWS region (default: us-east-1)')
@@ -519,7 +744,7 @@ def main():
 
         # Output result
         if args.output == 'json':
-            print(json.dumps(result, indent=2))
+            print(_dumps(result))
         else:
             print(f"Status: {result.get('status', 'UNKNOWN')}")
             print(f"Summary: {result.get('summary', 'No summary')}")
@@ -530,7 +755,7 @@ def main():
 
         # Set exit code based on result
         status = result.get('status', 'ERROR')
-        if status in ['FAIL', 'ERROR', 'LLD_DEVIATION_FOUND']:
+        if status in _FAIL_STATUSES:
             sys.exit(1)
         sys.exit(0)
 
@@ -19,6 +19,7 @@ Requirements:
     aioboto3>=13.1.0
     aiobotocore>=2.13.0
     aiohttp>=3.9.0
+    aiolimiter>=1.1.0
 
 Environment Variables:
     AWS_REGION: AWS region for Bedrock (default: us-east-1)
@@ -27,19 +28,41 @@ Environment Variables:
 
 import argparse
 import asyncio
+import fnmatch
+import functools
+import hashlib
+import io
 import json
 import logging
 import os
 import re
 import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aioboto3
+from aiolimiter import AsyncLimiter
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Prefer orjson for faster JSON parsing and output when available
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return (json.dumps(obj, indent=2) + '\n').encode('utf-8')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,9 +70,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-file diff header, used to split diffs without backtracking
+_DIFF_HEADER_RE = re.compile(r'^diff --git a/', re.MULTILINE)
+_DIFF_PATH_RE = re.compile(r'^diff --git a/.* b/(.*)$', re.MULTILINE)
+
 # Model configurations
 MODELS = {
     "haiku": "anthropic.claude-3-haiku-20240307-v1:0",
+    "haiku-3.5": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
     "sonnet": "anthropic.claude-3-5-sonnet-20241022-v2:0",
     "sonnet-4": "anthropic.claude-sonnet-4-20250514-v1:0",
     "opus": "anthropic.claude-opus-4-20250514-v1:0",
@@ -57,6 +85,49 @@ MODELS = {
 
 DEFAULT_MODEL = "haiku"
 
+# Models that accept performanceConfig latency "optimized" (only via their inference profile);
+# agents opt out with "latency": "standard"
+LATENCY_OPTIMIZED_MODELS = frozenset({
+    MODELS["haiku-3.5"],
+})
+
+# Diff compaction: file bodies never sent to the model
+COMPACT_SKIP_PATTERNS = ('*.lock', '*.min.js', '*.min.css', 'package-lock.json')
+COMPACT_MAX_FILE_LINES = 2000
+
+# On-disk Bedrock response cache lifetime (seconds)
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Per-agent list merged across chunks, and a cap on its size for pathological PRs
+CHUNK_ITEM_KEYS = {
+    "code_quality": "violations",
+    "architect": "patterns",
+}
+MAX_AGGREGATED_ITEMS = 10_000
+
+# Output token ceiling when several agents share one call (supported by every model in MODELS)
+COMBINED_MAX_TOKENS = 4096
+
+# Per-model Bedrock TPS budget: caps both concurrent calls and requests started per second
+MODEL_TPS = {
+    MODELS["haiku"]: 10,
+    MODELS["haiku-3.5"]: 10,
+    MODELS["sonnet"]: 5,
+    MODELS["sonnet-4"]: 5,
+    MODELS["opus"]: 2,
+}
+DEFAULT_MODEL_TPS = 5
+
+# Errors that will fail every Bedrock call in the run, so in-flight agents are cancelled
+FATAL_CLIENT_ERRORS = frozenset({"AccessDeniedException", "UnrecognizedClientException"})
+
+# Documentation and text files, which never contain code patterns worth reviewing
+NON_CODE_PATTERNS = ('*.md', '*.txt', '*.rst')
+
+# HTTP connection pool sizing: every concurrent converse call needs its own socket
+DEFAULT_MAX_POOL_CONNECTIONS = 64
+CHUNKS_PER_AGENT_ESTIMATE = 16
+
 # Agent configurations
 AGENTS = {
     "code_quality": {
@@ -83,64 +154,22 @@ AGENTS = {
     "pattern_matching": {
         "name": "Pattern Matching Agent",
         "prompt_file": "agents/pattern_matching_agent_spec.md",
-        "model": "haiku",
+        "model": "haiku-3.5",  # Latency-optimized; short structured output
         "temperature": 0.1,
         "max_tokens": 2048,
     },
     "jira_integration": {
         "name": "Jira Integration Agent",
         "prompt_file": "agents/jira_integration_agent.md",
-        "model": "haiku",
+        "model": "haiku-3.5",  # Latency-optimized; short structured output
         "temperature": 0.1,
         "max_tokens": 2048,
     },
 }
 
-
-class AsyncBedrockAgentRunner:
-    """Runs peer review agents using AWS Bedrock Claude models asynchronously."""
-
-    def __init__(self, region: str = "us-east-1"):
-        """Initialize the async Bedrock client configuration."""
-        self.region = region
-        self.config = Config(
-            retries={
-                'max_attempts': 5,
-                'mode': 'adaptive'
-            },
-            connect_timeout=10,
-            read_timeout=120
-        )
-        self.session = aioboto3.Session()
-        self.repo_root = self._find_repo_root()
-
-    def _find_repo_root(self) -> Path:
-        """Find the repository root directory."""
-        current = Path.cwd()
-        while current != current.parent:
-            if (current / '.git').exists():
-                return current
-            current = current.parent
-        return Path.cwd()
-
-    def _load_agent_prompt(self, agent_name: str) -> str:
-        """Load the agent specification/prompt from file."""
-        if agent_name not in AGENTS:
-            raise ValueError(f"Unknown agent: {agent_name}. Available: {list(AGENTS.keys())}")
-
-        agent_config = AGENTS[agent_name]
-        prompt_path = self.repo_root / agent_config["prompt_file"]
-
-        if not prompt_path.exists():
-            logger.warning(f"Agent prompt file not found: {prompt_path}")
-            return self._get_default_prompt(agent_name)
-
-        return prompt_path.read_text(encoding='utf-8')
-
-    def _get_default_prompt(self, agent_name: str) -> str:
-        """Get a default prompt for an agent if file doesn't exist."""
-        prompts = {
-            "code_quality": """You are an expert code reviewer. Analyze the code for:
+# Fallback prompts used when an agent spec file is missing
+_DEFAULT_PROMPTS = {
+    "code_quality": """You are an expert code reviewer. Analyze the code for:
 1. Code quality and best practices
 2. Potential bugs and errors
 3. Security vulnerabilities
@@ -163,7 +192,7 @@ Return your analysis as JSON with this structure:
     ],
     "summary": "Brief overall assessment"
 }""",
-            "architect": """You are a software architect reviewing code for architectural patterns.
+    "architect": """You are a software architect reviewing code for architectural patterns.
 Analyze the code to detect:
 1. New architectural patterns not in the approved library
 2. Pattern deviations from standards
@@ -183,7 +212,7 @@ Return your analysis as JSON with this structure:
     ],
     "summary": "Brief assessment"
 }""",
-            "lld_alignment": """You are reviewing code for alignment with Low-Level Design specifications.
+    "lld_alignment": """You are reviewing code for alignment with Low-Level Design specifications.
 Check if the implementation matches the documented LLD.
 
 Return your analysis as JSON with this structure:
@@ -200,24 +229,131 @@ Return your analysis as JSON with this structure:
     ],
     "summary": "Brief assessment"
 }""",
-        }
-        return prompts.get(agent_name, "You are a code review assistant. Analyze the provided code.")
+}
 
-    def _get_pr_context(self, pr_number: int) -> dict:
-        """Fetch PR context from GitHub (synchronous - runs once)."""
-        try:
-            pr_info = subprocess.run(
-                ['gh', 'pr', 'view', str(pr_number), '--json',
-                 'title,body,additions,deletions,changedFiles,files,author'],
-                capture_output=True, text=True, check=True
+
+@functools.lru_cache(maxsize=None)
+def _read_agent_prompt(repo_root: Path, agent_name: str) -> Optional[str]:
+    """Read an agent spec once per process. Returns None if the file is missing."""
+    prompt_path = repo_root / AGENTS[agent_name]["prompt_file"]
+
+    if not prompt_path.exists():
+        logger.warning(f"Agent prompt file not found: {prompt_path}")
+        return None
+
+    return prompt_path.read_text(encoding='utf-8')
+
+
+class AsyncBedrockAgentRunner:
+    """Runs peer review agents using AWS Bedrock Claude models asynchronously."""
+
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+        use_cache: bool = True,
+        cache_ttl: int = DEFAULT_CACHE_TTL
+    ):
+        """Initialize the async Bedrock client configuration."""
+        self.region = region
+        self.config = Config(
+            retries={
+                'max_attempts': 8,
+                'mode': 'standard'  # Pacing is done client-side by the per-model limiters
+            },
+            connect_timeout=10,
+            read_timeout=120,
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=True
+        )
+        self.session = aioboto3.Session()
+        self.repo_root = self._find_repo_root()
+        self._client_cm = None
+        self._client = None
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._limiters: Dict[str, AsyncLimiter] = {}
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl
+        self._cache_dir = self.repo_root / '.cache' / 'bedrock'
+
+    def _sem_for(self, model_id: str, limit: int) -> asyncio.Semaphore:
+        """Get (lazily creating) the concurrency semaphore for a model."""
+        if model_id not in self._model_semaphores:
+            self._model_semaphores[model_id] = asyncio.Semaphore(limit)
+        return self._model_semaphores[model_id]
+
+    def _limiter_for(self, model_id: str) -> AsyncLimiter:
+        """Get (lazily creating) the requests-per-second limiter for a model."""
+        if model_id not in self._limiters:
+            self._limiters[model_id] = AsyncLimiter(
+                max_rate=MODEL_TPS.get(model_id, DEFAULT_MODEL_TPS), time_period=1
             )
-            pr_data = json.loads(pr_info.stdout)
+        return self._limiters[model_id]
+
+    async def __aenter__(self) -> "AsyncBedrockAgentRunner":
+        """Open one Bedrock client shared by every agent and chunk call."""
+        self._client_cm = self.session.client(
+            "bedrock-runtime",
+            region_name=self.region,
+            config=self.config
+        )
+        self._client = await self._client_cm.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the shared Bedrock client."""
+        if self._client_cm is not None:
+            await self._client_cm.__aexit__(exc_type, exc, tb)
+        self._client_cm = None
+        self._client = None
 
-            diff_result = subprocess.run(
-                ['gh', 'pr', 'diff', str(pr_number)],
-                capture_output=True, text=True, check=True
+    def _find_repo_root(self) -> Path:
+        """Find the repository root directory."""
+        current = Path.cwd()
+        while current != current.parent:
+            if (current / '.git').exists():
+                return current
+            current = current.parent
+        return Path.cwd()
+
+    def _load_agent_prompt(self, agent_name: str) -> str:
+        """Load the agent specification/prompt from file."""
+        if agent_name not in AGENTS:
+            raise ValueError(f"Unknown agent: {agent_name}. Available: {list(AGENTS.keys())}")
+
+        prompt = _read_agent_prompt(self.repo_root, agent_name)
+        if prompt is None:
+            return self._get_default_prompt(agent_name)
+        return prompt
+
+    def _get_default_prompt(self, agent_name: str) -> str:
+        """Get a default prompt for an agent if file doesn't exist."""
+        return _DEFAULT_PROMPTS.get(agent_name, "You are a code review assistant. Analyze the provided code.")
+
+    async def _run_gh(self, *args: str) -> str:
+        """Run a gh CLI command and return its stdout."""
+        proc = await asyncio.create_subprocess_exec(
+            'gh', *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, ['gh', *args], output=stdout, stderr=stderr
+            )
+        return stdout.decode('utf-8')
+
+    async def _get_pr_context(self, pr_number: int) -> dict:
+        """Fetch PR context from GitHub, running the metadata and diff fetches concurrently."""
+        try:
+            pr_json, pr_diff = await asyncio.gather(
+                self._run_gh('pr', 'view', str(pr_number), '--json',
+                             'title,body,additions,deletions,changedFiles,files,author'),
+                self._run_gh('pr', 'diff', str(pr_number))
             )
-            pr_diff = diff_result.stdout
+            pr_data = json.loads(pr_json)
+            files = [f.get("path") for f in pr_data.get("files", [])]
 
             return {
                 "pr_number": pr_number,
@@ -227,8 +363,9 @@ Return your analysis as JSON with this structure:
                 "additions": pr_data.get("additions", 0),
                 "deletions": pr_data.get("deletions", 0),
                 "files_changed": pr_data.get("changedFiles", 0),
-                "files": [f.get("path") for f in pr_data.get("files", [])],
-                "diff": pr_diff
+                "files": files,
+                "files_block": '\n'.join(files[:50]),  # Prompt-ready list, built once per run
+                "diff": self._compact_diff(pr_diff)
             }
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to fetch PR context: {e}")
@@ -237,33 +374,88 @@ Return your analysis as JSON with this structure:
             logger.error(f"Failed to parse PR data: {e}")
             raise
 
+    def _compact_diff(self, diff: str) -> str:
+        """
+        Reduce a diff to its signal-bearing lines.
+
+        Keeps file headers, hunk headers and +/- lines, collapses runs of
+        unchanged context lines into a count, and omits the bodies of
+        lockfiles, minified assets, binary patches and very large files.
+        """
+        starts = [m.start() for m in _DIFF_HEADER_RE.finditer(diff)]
+        if not starts:
+            return diff
+        ends = starts[1:] + [len(diff)]
+
+        out = [diff[:starts[0]]]
+        for start, end in zip(starts, ends):
+            lines = diff[start:end].splitlines(keepends=True)
+            header = lines[0]
+            path = header.rstrip('\n').rsplit(' b/', 1)[-1]
+            name = path.rsplit('/', 1)[-1]
+
+            if (any(fnmatch.fnmatch(name, pattern) for pattern in COMPACT_SKIP_PATTERNS)
+                    or len(lines) > COMPACT_MAX_FILE_LINES
+                    or any(line.startswith('GIT binary patch') for line in lines)):
+                out.append(header)
+                out.append(f"…({len(lines) - 1} lines omitted)\n")
+                continue
+
+            context_run = 0
+            for line in lines:
+                if line.startswith(' ') or line == '\n':
+                    context_run += 1
+                    continue
+                if context_run:
+                    out.append(f"…({context_run} unchanged lines)\n")
+                    context_run = 0
+                out.append(line)
+            if context_run:
+                out.append(f"…({context_run} unchanged lines)\n")
+
+        return ''.join(out)
+
     def _chunk_diff(self, diff: str, max_chars: int = 50000) -> List[str]:
         """Split large diffs into chunks by file."""
         if len(diff) <= max_chars:
             return [diff]
 
-        file_pattern = r'(diff --git a/.*?(?=diff --git a/|\Z))'
-        file_diffs = re.findall(file_pattern, diff, re.DOTALL)
+        # Walk file header offsets once; slice per-file diffs between them
+        starts = [m.start() for m in _DIFF_HEADER_RE.finditer(diff)]
+        ends = starts[1:] + [len(diff)]
 
         chunks = []
-        current_chunk = ""
-
-        for file_diff in file_diffs:
-            if len(current_chunk) + len(file_diff) > max_chars and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = file_diff
+        current_parts: List[str] = []
+        current_len = 0
+
+        for start, end in zip(starts, ends):
+            file_diff = diff[start:end]
+            if current_len + len(file_diff) > max_chars and current_parts:
+                chunks.append(''.join(current_parts))
+                current_parts = [file_diff]
+                current_len = len(file_diff)
             else:
-                current_chunk += file_diff
+                current_parts.append(file_diff)
+                current_len += len(file_diff)
 
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_parts:
+            chunks.append(''.join(current_parts))
 
         logger.info(f"Split diff into {len(chunks)} chunks")
         return chunks
 
     def _create_review_prompt(self, agent_prompt: str, pr_context: dict) -> str:
         """Create the full prompt for the review."""
-        return f"""{agent_prompt}
+        prefix, suffix = self._create_review_prompt_parts(agent_prompt, pr_context)
+        return prefix + pr_context['diff'][:100000] + suffix
+
+    def _create_review_prompt_parts(self, agent_prompt: str, pr_context: dict) -> Tuple[str, str]:
+        """Create the constant prompt text before and after the diff."""
+        # Contexts built outside _get_pr_context may lack the precomputed files block
+        files_block = pr_context.get('files_block')
+        if files_block is None:
+            files_block = '\n'.join(pr_context['files'][:50])
+        prefix = f"""{agent_prompt}
 
 <pull_request>
 <metadata>
@@ -280,15 +472,115 @@ Deletions: {pr_context['deletions']}
 </description>
 
 <files>
-{chr(10).join(pr_context['files'][:50])}
+{files_block}
 </files>
 
 <diff>
-{pr_context['diff'][:100000]}
+"""
+        suffix = """
 </diff>
 </pull_request>
 
 Analyze this pull request and provide your review as valid JSON only. Do not include any markdown formatting or code blocks - just the raw JSON object."""
+        return prefix, suffix
+
+    async def _converse_stream(
+        self,
+        model_id: str,
+        full_prompt: str,
+        agent_config: dict
+    ) -> Tuple[str, dict]:
+        """
+        Call Bedrock converse_stream under the model's concurrency limit.
+
+        Returns:
+            Tuple of (response text, usage dictionary)
+        """
+        request = {
+            "modelId": model_id,
+            "messages": [
+                {"role": "user", "content": [{"text": full_prompt}]}
+            ],
+            "inferenceConfig": {
+                "maxTokens": agent_config["max_tokens"],
+                "temperature": agent_config["temperature"],
+                "topP": 0.9
+            }
+        }
+        latency = agent_config.get("latency", "optimized")
+        if latency == "optimized" and model_id in LATENCY_OPTIMIZED_MODELS:
+            request["performanceConfig"] = {"latency": latency}
+
+        cache_key = hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached Bedrock response {cache_key[:12]}")
+            return cached["text"], cached.get("usage", {})
+
+        truncated = False
+        async with self._sem_for(model_id, MODEL_TPS.get(model_id, DEFAULT_MODEL_TPS)):
+            async with self._limiter_for(model_id):
+                response = await self._client.converse_stream(**request)
+
+            text = io.StringIO()
+            usage: dict = {}
+            async for event in response['stream']:
+                if 'contentBlockDelta' in event:
+                    text.write(event['contentBlockDelta']['delta'].get('text', ''))
+                elif 'messageStop' in event:
+                    if event['messageStop'].get('stopReason') == 'max_tokens':
+                        logger.warning("Response truncated at max_tokens; JSON may be incomplete")
+                        truncated = True
+                elif 'metadata' in event:
+                    usage = event['metadata'].get('usage', {})
+
+        response_text = text.getvalue()
+        if not truncated:
+            # Only cache responses that parse, so a malformed reply is retried on the next run
+            try:
+                _loads(self._extract_json(response_text))
+            except json.JSONDecodeError:
+                logger.warning("Not caching Bedrock response that is not valid JSON")
+            else:
+                self._cache_put(cache_key, {"text": response_text, "usage": usage})
+        return response_text, usage
+
+    def _cache_get(self, key: str) -> Optional[dict]:
+        """Return a cached Bedrock response if present and within the TTL."""
+        if not self.use_cache:
+            return None
+        path = self._cache_dir / key
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl:
+                return None
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _cache_put(self, key: str, value: dict) -> None:
+        """Atomically write a Bedrock response to the cache."""
+        if not self.use_cache:
+            return
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_dir / f"{key}.{os.getpid()}.tmp"
+            tmp_path.write_text(json.dumps(value), encoding='utf-8')
+            os.replace(tmp_path, self._cache_dir / key)
+        except OSError as e:
+            logger.warning(f"Failed to write response cache: {e}")
+
+    def _should_skip(self, agent_name: str, pr_context: dict) -> Optional[dict]:
+        """Return a canned result if the agent has nothing to analyse, else None."""
+        if agent_name == "pattern_matching":
+            paths = _DIFF_PATH_RE.findall(pr_context['diff'])
+            if paths and all(
+                any(fnmatch.fnmatch(path, pattern) for pattern in NON_CODE_PATTERNS)
+                for path in paths
+            ):
+                logger.info("Skipping pattern_matching: PR only changes documentation files")
+                return {"status": "NO_NEW_PATTERN", "patterns": [], "summary": "Skipped: documentation-only changes"}
+
+        return None
 
     async def invoke_agent(
         self,
@@ -307,6 +599,10 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         Returns:
             Agent response as dictionary
         """
+        skipped = self._should_skip(agent_name, pr_context)
+        if skipped is not None:
+            return skipped
+
         agent_config = AGENTS[agent_name]
         model_key = model_override or agent_config["model"]
         model_id = MODELS.get(model_key, MODELS[DEFAULT_MODEL])
@@ -321,45 +617,24 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
             logger.warning("Large PR detected, using parallel chunked analysis")
             return await self._invoke_chunked_parallel(agent_name, agent_config, model_id, pr_context)
 
-        async with self.session.client(
-            "bedrock-runtime",
-            region_name=self.region,
-            config=self.config
-        ) as client:
-            try:
-                response = await client.converse(
-                    modelId=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [{"text": full_prompt}]
-                        }
-                    ],
-                    inferenceConfig={
-                        "maxTokens": agent_config["max_tokens"],
-                        "temperature": agent_config["temperature"],
-                        "topP": 0.9
-                    }
-                )
-
-                response_text = response['output']['message']['content'][0]['text']
-
-                usage = response.get('usage', {})
-                logger.info(f"Tokens used - Input: {usage.get('inputTokens', 'N/A')}, "
-                           f"Output: {usage.get('outputTokens', 'N/A')}")
-
-                return self._parse_json_response(response_text, agent_name)
-
-            except ClientError as e:
-                error_code = e.response['Error']['Code']
-                if error_code == 'ThrottlingException':
-                    logger.error("Rate limit exceeded. Retrying with backoff...")
-                    # aioboto3 handles retries via config, but we can add custom logic
-                elif error_code == 'ValidationException':
-                    logger.error(f"Invalid request: {e}")
-                elif error_code == 'AccessDeniedException':
-                    logger.error("Access denied. Check IAM permissions for Bedrock.")
-                raise
+        try:
+            response_text, usage = await self._converse_stream(model_id, full_prompt, agent_config)
+
+            logger.info(f"Tokens used - Input: {usage.get('inputTokens', 'N/A')}, "
+                       f"Output: {usage.get('outputTokens', 'N/A')}")
+
+            return self._parse_json_response(response_text, agent_name)
+
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code == 'ThrottlingException':
+                logger.error("Rate limit exceeded. Retrying with backoff...")
+                # aioboto3 handles retries via config, but we can add custom logic
+            elif error_code == 'ValidationException':
+                logger.error(f"Invalid request: {e}")
+            elif error_code == 'AccessDeniedException':
+                logger.error("Access denied. Check IAM permissions for Bedrock.")
+            raise
 
     async def _invoke_chunked_parallel(
         self,
@@ -372,47 +647,82 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         chunks = self._chunk_diff(pr_context['diff'])
         agent_prompt = self._load_agent_prompt(agent_name)
 
-        async def process_chunk(chunk: str, chunk_num: int) -> dict:
-            """Process a single chunk asynchronously."""
-            chunk_context = pr_context.copy()
-            chunk_context['diff'] = chunk
-
-            full_prompt = self._create_review_prompt(agent_prompt, chunk_context)
-
-            async with self.session.client(
-                "bedrock-runtime",
-                region_name=self.region,
-                config=self.config
-            ) as client:
-                try:
-                    response = await client.converse(
-                        modelId=model_id,
-                        messages=[
-                            {"role": "user", "content": [{"text": full_prompt}]}
-                        ],
-                        inferenceConfig={
-                            "maxTokens": agent_config["max_tokens"],
-                            "temperature": agent_config["temperature"],
-                            "topP": 0.9
-                        }
-                    )
-
-                    response_text = response['output']['message']['content'][0]['text']
-                    return self._parse_json_response(response_text, agent_name)
-
-                except ClientError as e:
-                    logger.error(f"Error processing chunk {chunk_num}: {e}")
-                    return {"status": "ERROR", "chunk": chunk_num, "error": str(e)}
-
-        # Process all chunks in parallel
-        logger.info(f"Processing {len(chunks)} chunks in parallel...")
-        tasks = [process_chunk(chunk, i) for i, chunk in enumerate(chunks)]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Only the diff varies per chunk; build the surrounding prompt once
+        prompt_prefix, prompt_suffix = self._create_review_prompt_parts(agent_prompt, pr_context)
 
-        # Filter out exceptions
-        valid_results = [r for r in results if isinstance(r, dict) and r.get("status") != "ERROR"]
+        async def process_chunk(chunk: str, chunk_num: int) -> Tuple[int, dict]:
+            """Process a single chunk asynchronously, tagging the result with its index."""
+            full_prompt = prompt_prefix + chunk[:100000] + prompt_suffix
 
-        return self._aggregate_chunk_results(valid_results, agent_name)
+            try:
+                response_text, _ = await self._converse_stream(model_id, full_prompt, agent_config)
+                return chunk_num, self._parse_json_response(response_text, agent_name)
+
+            except ClientError as e:
+                logger.error(f"Error processing chunk {chunk_num}: {e}")
+                return chunk_num, {"status": "ERROR", "chunk": chunk_num, "error": str(e)}
+
+        # Process all chunks in parallel, folding each result in as it completes
+        logger.info(f"Processing {len(chunks)} chunks in parallel...")
+        tasks = [process_chunk(chunk, i) for i, chunk in enumerate(chunks)]
+        # Each chunk is now referenced only by its task, so it is freed once that task finishes
+        del chunks
+
+        item_key = CHUNK_ITEM_KEYS.get(agent_name)
+        items_by_chunk: Dict[int, List[dict]] = {}
+        total_items = 0
+        kept_items = 0
+        new_pattern_found = False
+        first_chunk = -1
+        first_result: Optional[dict] = None
+        chunk_count = 0
+
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                chunk_num, result = await next_done
+            except Exception as e:
+                logger.error(f"Chunk failed with exception: {e}")
+                continue
+            if not isinstance(result, dict) or result.get("status") == "ERROR":
+                continue
+
+            chunk_count += 1
+            if result.get("new_pattern_found"):
+                new_pattern_found = True
+            if item_key is None:
+                # Completion order varies run to run; keep the earliest chunk's result
+                if first_result is None or chunk_num < first_chunk:
+                    first_chunk, first_result = chunk_num, result
+                continue
+
+            chunk_items = result.get(item_key) or []
+            if not chunk_items:
+                continue
+            total_items += len(chunk_items)
+            kept_items += len(chunk_items)
+            items_by_chunk[chunk_num] = chunk_items
+
+            # Enforce the cap as results arrive by trimming the highest-index chunks, so the
+            # retained set stays bounded and is the same whatever order chunks finish in
+            while kept_items > MAX_AGGREGATED_ITEMS:
+                last = max(items_by_chunk)
+                excess = kept_items - MAX_AGGREGATED_ITEMS
+                last_items = items_by_chunk[last]
+                if len(last_items) <= excess:
+                    del items_by_chunk[last]
+                    kept_items -= len(last_items)
+                else:
+                    del last_items[-excess:]
+                    kept_items -= excess
+
+        # Join in diff order so the output does not depend on which chunk finished first
+        items: List[dict] = []
+        for chunk_num in sorted(items_by_chunk):
+            items.extend(items_by_chunk[chunk_num])
+
+        return self._aggregate_chunk_results(
+            agent_name, chunk_count, items, new_pattern_found, first_result, total_items
+        )
 
     async def run_agents_parallel(
         self,
@@ -433,67 +743,179 @@ Analyze this pull request and provide your review as valid JSON only. Do not inc
         """
         logger.info(f"Running {len(agent_names)} agents in parallel...")
 
-        async def run_single(agent_name: str) -> tuple:
-            result = await self.invoke_agent(agent_name, pr_context, model_override)
-            return agent_name, result
-
-        tasks = [run_single(name) for name in agent_names]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
         output = {}
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Agent failed with exception: {result}")
+        remaining = []
+        for name in agent_names:
+            skipped = self._should_skip(name, pr_context)
+            if skipped is not None:
+                output[name] = skipped
             else:
-                agent_name, agent_result = result
-                output[agent_name] = agent_result
+                remaining.append(name)
+
+        # Agents sharing model and temperature can share one Bedrock call, as long as
+        # their combined output budget still fits in a single response
+        groups: List[List[str]] = []
+        open_groups: Dict[tuple, tuple] = {}
+        for name in remaining:
+            agent_config = AGENTS[name]
+            model_id = MODELS.get(model_override or agent_config["model"], MODELS[DEFAULT_MODEL])
+            key = (model_id, agent_config["temperature"])
+            group, budget = open_groups.get(key, (None, 0))
+            if group is None or budget + agent_config["max_tokens"] > COMBINED_MAX_TOKENS:
+                group, budget = [], 0
+                groups.append(group)
+            group.append(name)
+            open_groups[key] = (group, budget + agent_config["max_tokens"])
+
+        async def run_group(group: List[str]) -> Dict[str, dict]:
+            if len(group) == 1:
+                return {group[0]: await self.invoke_agent(group[0], pr_context, model_override)}
+            return await self._invoke_combined(group, pr_context, model_override)
+
+        pending = set()
+        for group in groups:
+            task = asyncio.create_task(run_group(group))
+            task.set_name(', '.join(group))
+            pending.add(task)
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                exc = task.exception()
+                if exc is None:
+                    output.update(task.result())
+                    continue
+
+                logger.error(f"Agent {task.get_name()} failed with exception: {exc}")
+                if (isinstance(exc, ClientError)
+                        and exc.response['Error']['Code'] in FATAL_CLIENT_ERRORS
+                        and pending):
+                    # Bad credentials fail every call; stop the rest instead of retrying them
+                    logger.error("Bedrock rejected the credentials, cancelling remaining agents")
+                    for other in pending:
+                        other.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    pending = set()
+
+        return output
+
+    def _create_combined_agent_prompt(self, agent_names: List[str]) -> str:
+        """Merge several agent specs into one prompt asking for a JSON object keyed by agent id."""
+        sections = [
+            f'<agent id="{name}">\n{self._load_agent_prompt(name)}\n</agent>'
+            for name in agent_names
+        ]
+        agent_ids = ', '.join(f'"{name}"' for name in agent_names)
+        return f"""You are performing {len(agent_names)} independent reviews of the same pull request.
+Each review is defined by the instructions inside its <agent> section.
+
+{chr(10).join(sections)}
+
+Return a single JSON object whose keys are the agent ids ({agent_ids}) and whose
+values are each agent's review, in exactly the JSON structure that agent's instructions specify."""
+
+    async def _invoke_combined(
+        self,
+        agent_names: List[str],
+        pr_context: dict,
+        model_override: Optional[str] = None
+    ) -> Dict[str, dict]:
+        """
+        Run several agents that share a model and temperature in one Bedrock call.
+
+        The call's output budget is the sum of the agents' own max_tokens, which
+        run_agents_parallel keeps within COMBINED_MAX_TOKENS.
+
+        Agents missing from the combined response (or all of them, if the PR needs
+        chunking) are run individually via invoke_agent.
+
+        Returns:
+            Dictionary mapping agent names to their results
+        """
+        agent_config = AGENTS[agent_names[0]]
+        model_id = MODELS.get(model_override or agent_config["model"], MODELS[DEFAULT_MODEL])
+
+        full_prompt = self._create_review_prompt(self._create_combined_agent_prompt(agent_names), pr_context)
+
+        output: Dict[str, dict] = {}
+        if len(full_prompt) > 150000:
+            logger.warning("Large PR detected, running grouped agents individually")
+        else:
+            logger.info(f"Running {', '.join(agent_names)} in one call with model {model_id} (async)")
+            group_config = {
+                **agent_config,
+                "max_tokens": sum(AGENTS[name]["max_tokens"] for name in agent_names),
+            }
+            response_text, usage = await self._converse_stream(model_id, full_prompt, group_config)
+            logger.info(f"Tokens used - Input: {usage.get('inputTokens', 'N/A')}, "
+                       f"Output: {usage.get('outputTokens', 'N/A')}")
+
+            combined = self._parse_json_response(response_text, "combined")
+            for name in agent_names:
+                if isinstance(combined.get(name), dict) and "status" in combined[name]:
+                    output[name] = combined[name]
+
+        missing = [name for name in agent_names if name not in output]
+        if missing:
+            logger.info(f"Running {', '.join(missing)} individually")
+            results = await asyncio.gather(
+                *(self.invoke_agent(name, pr_context, model_override) for name in missing)
+            )
+            output.update(zip(missing, results))
 
         return output
 
-    def _aggregate_chunk_results(self, results: List[dict], agent_name: str) -> dict:
-        """Aggregate results from multiple chunks."""
-        if not results:
+    def _aggregate_chunk_results(
+        self,
+        agent_name: str,
+        chunk_count: int,
+        items: List[dict],
+        new_pattern_found: bool,
+        first_result: Optional[dict],
+        total_items: int
+    ) -> dict:
+        """Build the final result from aggregated chunk results; ``total_items`` counts items before capping."""
+        if not chunk_count:
             return {"status": "ERROR", "error": "No results from chunk processing"}
 
         if agent_name == "code_quality":
-            all_violations = []
-            for r in results:
-                all_violations.extend(r.get("violations", []))
-
-            status = "FAIL" if all_violations else "PASS"
-            return {
+            status = "FAIL" if items else "PASS"
+            result = {
                 "status": status,
-                "violations_count": len(all_violations),
-                "violations": all_violations,
-                "summary": f"Aggregated review from {len(results)} chunks"
+                "violations_count": total_items,
+                "violations": items,
+                "summary": f"Aggregated review from {chunk_count} chunks"
             }
 
         elif agent_name == "architect":
-            all_patterns = []
-            for r in results:
-                all_patterns.extend(r.get("patterns", []))
-
-            new_pattern_found = any(r.get("new_pattern_found", False) for r in results)
             status = "NEW_PATTERN_DETECTED" if new_pattern_found else "NO_NEW_PATTERN"
-
-            return {
+            result = {
                 "status": status,
                 "new_pattern_found": new_pattern_found,
-                "patterns": all_patterns,
-                "summary": f"Aggregated analysis from {len(results)} chunks"
+                "patterns": items,
+                "summary": f"Aggregated analysis from {chunk_count} chunks"
             }
 
-        result = results[0]
-        result["_note"] = f"Aggregated from {len(results)} chunks"
+        else:
+            result = first_result
+            result["_note"] = f"Aggregated from {chunk_count} chunks"
+
+        if total_items > len(items):
+            result["_truncated"] = f"Results capped at {MAX_AGGREGATED_ITEMS} of {total_items} items"
         return result
 
+    def _extract_json(self, response_text: str) -> str:
+        """Slice out the outermost JSON object, dropping any markdown fences or prose."""
+        start = response_text.find('{')
+        end = response_text.rfind('}')
+        return response_text[start:end + 1] if start != -1 and end > start else response_text.strip()
+
     def _parse_json_response(self, response_text: str, agent_name: str) -> dict:
         """Parse JSON from Claude's response."""
-        cleaned = re.sub(r'```(?:json)?\s*', '', response_text)
-        cleaned = re.sub(r'```\s*$', '', cleaned).strip()
-
         try:
-            return json.loads(cleaned)
+            return _loads(self._extract_json(response_text))
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse JSON response: {e}")
             return self._get_default_response(agent_name, response_text)
@@ -542,6 +964,10 @@ async def main_async():
                        help='AWS region (default: us-east-1)')
     parser.add_argument('--output', choices=['json', 'summary'], default='json',
                        help='Output format')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always call Bedrock instead of reusing cached responses')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_CACHE_TTL,
+                       help=f'Max age of cached responses in seconds (default: {DEFAULT_CACHE_TTL})')
 
     args = parser.parse_args()
 
@@ -549,43 +975,54 @@ async def main_async():
     if not args.agent and not args.parallel and not args.agents:
         parser.error("Must specify --agent, --parallel, or --agents")
 
-    try:
-        runner = AsyncBedrockAgentRunner(region=args.region)
-
-        logger.info(f"Fetching PR #{args.pr} context...")
-        pr_context = runner._get_pr_context(args.pr)
-        logger.info(f"PR: {pr_context['title']} ({pr_context['files_changed']} files, "
-                   f"+{pr_context['additions']}/-{pr_context['deletions']})")
-
-        if args.parallel or args.agents:
-            # Parallel execution
-            agents_to_run = args.agents if args.agents else list(AGENTS.keys())
-            results = await runner.run_agents_parallel(agents_to_run, pr_context, args.model)
+    agents_to_run = [args.agent]
+    if args.parallel or args.agents:
+        agents_to_run = args.agents if args.agents else list(AGENTS.keys())
+    max_pool_connections = max(
+        DEFAULT_MAX_POOL_CONNECTIONS,
+        len(agents_to_run) * CHUNKS_PER_AGENT_ESTIMATE
+    )
 
-            if args.output == 'json':
-                print(json.dumps(results, indent=2))
-            else:
-                for agent_name, result in results.items():
-                    print(f"\n{agent_name}: {result.get('status', 'UNKNOWN')}")
-                    print(f"  Summary: {result.get('summary', 'No summary')}")
-
-            # Determine overall status
-            statuses = [r.get('status', 'ERROR') for r in results.values()]
-            if any(s in ['FAIL', 'ERROR', 'LLD_DEVIATION_FOUND'] for s in statuses):
-                sys.exit(1)
-        else:
-            # Single agent execution
-            result = await runner.invoke_agent(args.agent, pr_context, args.model)
-
-            if args.output == 'json':
-                print(json.dumps(result, indent=2))
+    try:
+        async with AsyncBedrockAgentRunner(
+            region=args.region,
+            max_pool_connections=max_pool_connections,
+            use_cache=not args.no_cache,
+            cache_ttl=args.cache_ttl
+        ) as runner:
+            logger.info(f"Fetching PR #{args.pr} context...")
+            pr_context = await runner._get_pr_context(args.pr)
+            logger.info(f"PR: {pr_context['title']} ({pr_context['files_changed']} files, "
+                       f"+{pr_context['additions']}/-{pr_context['deletions']})")
+
+            if args.parallel or args.agents:
+                # Parallel execution
+                results = await runner.run_agents_parallel(agents_to_run, pr_context, args.model)
+
+                if args.output == 'json':
+                    sys.stdout.buffer.write(_dumps(results))
+                else:
+                    for agent_name, result in results.items():
+                        print(f"\n{agent_name}: {result.get('status', 'UNKNOWN')}")
+                        print(f"  Summary: {result.get('summary', 'No summary')}")
+
+                # Determine overall status
+                statuses = [r.get('status', 'ERROR') for r in results.values()]
+                if any(s in ['FAIL', 'ERROR', 'LLD_DEVIATION_FOUND'] for s in statuses):
+                    sys.exit(1)
             else:
-                print(f"Status: {result.get('status', 'UNKNOWN')}")
-                print(f"Summary: {result.get('summary', 'No summary')}")
-
-            status = result.get('status', 'ERROR')
-            if status in ['FAIL', 'ERROR', 'LLD_DEVIATION_FOUND']:
-                sys.exit(1)
+                # Single agent execution
+                result = await runner.invoke_agent(args.agent, pr_context, args.model)
+
+                if args.output == 'json':
+                    sys.stdout.buffer.write(_dumps(result))
+                else:
+                    print(f"Status: {result.get('status', 'UNKNOWN')}")
+                    print(f"Summary: {result.get('summary', 'No summary')}")
+
+                status = result.get('status', 'ERROR')
+                if status in ['FAIL', 'ERROR', 'LLD_DEVIATION_FOUND']:
+                    sys.exit(1)
 
         sys.exit(0)
 